@@ -15,6 +15,7 @@ Steps = dict[int, tuple[int, int | None]]
 
 # basically a dataclass/attrs, but attrs are not available on CircuitPython
 class FanConfig:
+    __slots__ = ('model', 'rpm_control_mode', 'pwm_frequency', 'steps', 'minimum_duty_cycle', 'maximum_duty_cycle', 'minimum_rpm', 'maximum_rpm')
 
     def __init__(self, model: str, rpm_control_mode: RpmControlMode, minimum_duty_cycle: int | None, maximum_duty_cycle: int | None, minimum_rpm: int, maximum_rpm: int, pwm_frequency: int | None = None, steps: Steps | None = None):
         self.model = model
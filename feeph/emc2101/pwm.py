@@ -3,8 +3,10 @@
 # a reimplementation of https://github.com/adafruit/Adafruit_CircuitPython_EMC2101
 # Datasheet: https://ww1.microchip.com/downloads/en/DeviceDoc/2101.pdf
 
+import bisect
 import logging
 from enum import Enum
+from typing import Iterable
 
 # module busio provides no type hints
 import busio  # type: ignore
@@ -17,6 +19,9 @@ from feeph.emc2101.fan_configs import FanConfig, RpmControlMode, generic_pwm_fan
 
 LH = logging.getLogger('feeph.emc2101')
 
+# sorted step values, their steps and the steps' position in the fan config
+_StepLookup = tuple[tuple[int, ...], tuple[int, ...], tuple[int, ...]]
+
 
 class FanSpeedUnit(Enum):
     STEP    = 1  # steps       0..15
@@ -34,6 +39,7 @@ class PinSixMode(Enum):
 
 
 class DeviceConfig:
+    __slots__ = ('i2c_address', 'rpm_control_mode', 'pin_six_mode')
 
     def __init__(self, rpm_control_mode: RpmControlMode, pin_six_mode: PinSixMode):
         """
@@ -78,8 +84,7 @@ class Emc2101_PWM(Emc2101):
             LH.info("EMC2101 and connected fan both use PWM to control fan speed. Good.")
             pwm_d, pwm_f = feeph.emc2101.utilities.calculate_pwm_factors(pwm_frequency=fan_config.pwm_frequency)
             if fan_config.steps:
-                steps = list(fan_config.steps.keys())
-                self.configure_pwm_control(pwm_d=pwm_d, pwm_f=pwm_f, step_max=max(steps))
+                self.configure_pwm_control(pwm_d=pwm_d, pwm_f=pwm_f, step_max=max(fan_config.steps))
             else:
                 raise ValueError("fan config must have at least 1 step")
         else:
@@ -88,6 +93,9 @@ class Emc2101_PWM(Emc2101):
         self.configure_ets(ets_config)
         # -- all good: set internal state --
         self._fan_config = fan_config
+        self._valid_steps = frozenset(fan_config.steps)
+        self._percent_lookup = _build_step_lookup((step, percent) for step, (percent, _) in fan_config.steps.items())
+        self._rpm_lookup = _build_step_lookup((step, rpm) for step, (_, rpm) in fan_config.steps.items())
 
     # ---------------------------------------------------------------------
     # fan speed control
@@ -112,13 +120,13 @@ class Emc2101_PWM(Emc2101):
         if unit == FanSpeedUnit.PERCENT:
             if 0 <= value <= 100:
                 LH.debug("Converting percentage to internal value.")
-                step = _convert_percent2step(self._fan_config, value)
+                step = _convert_percent2step(self._percent_lookup, value)
             else:
                 raise ValueError(f"provided value {value} is out of range (0 ≤ x ≤ 100%)")
         elif unit == FanSpeedUnit.RPM:
             if 0 <= value <= self._max_rpm:
                 LH.debug("Converting RPM to internal value.")
-                result = _convert_rpm2step(self._fan_config, value)
+                result = _convert_rpm2step(self._rpm_lookup, value)
                 if result is not None:
                     step = result
                 else:
@@ -126,7 +134,7 @@ class Emc2101_PWM(Emc2101):
             else:
                 raise ValueError(f"provided value {value} is out of range (0 ≤ x ≤ {self._max_rpm}RPM)")
         elif unit == FanSpeedUnit.STEP:
-            if _is_valid_step(self._fan_config, value):
+            if _is_valid_step(self._valid_steps, value):
                 step = value
             else:
                 raise ValueError(f"provided value {value} is not a valid step")
@@ -152,9 +160,9 @@ class Emc2101_PWM(Emc2101):
         lut_table = {}
         for temp, value in values.items():
             if unit == FanSpeedUnit.PERCENT:
-                step = _convert_percent2step(self._fan_config, value)
+                step = _convert_percent2step(self._percent_lookup, value)
             elif unit == FanSpeedUnit.RPM:
-                result = _convert_rpm2step(self._fan_config, value)
+                result = _convert_rpm2step(self._rpm_lookup, value)
                 if result is not None:
                     step = result
                 else:
@@ -163,7 +171,7 @@ class Emc2101_PWM(Emc2101):
                 step = value
             else:
                 raise ValueError("unknown value type")
-            if step in self._fan_config.steps:
+            if _is_valid_step(self._valid_steps, step):
                 lut_table[temp] = step
             else:
                 LH.error("Unable to process provided value '%i'! Skipping.", value)
@@ -174,37 +182,61 @@ class Emc2101_PWM(Emc2101):
             return False
 
 
-def _convert_percent2step(fan_config: FanConfig, percent: int) -> int:
+def _build_step_lookup(pairs: Iterable[tuple[int, int | None]]) -> _StepLookup:
+    """
+    build a lookup table for the provided (step, value) pairs
+     - pairs without a value are skipped
+     - a value of 0 is treated as 1 (avoids a division by zero)
+     - if multiple steps share the same value only the first one is kept
+       (the other ones can never be selected)
+    """
+    entries: dict[int, tuple[int, int]] = {}
+    for position, (step, value) in enumerate(pairs):
+        if value is not None:
+            entries.setdefault(1 if value == 0 else value, (step, position))
+    ordered = sorted(entries.items())
+    values = tuple(value for value, _ in ordered)
+    steps = tuple(step for _, (step, _) in ordered)
+    positions = tuple(position for _, (_, position) in ordered)
+    return (values, steps, positions)
+
+
+def _find_closest_step(lookup: _StepLookup, value: int) -> int | None:
+    """
+    find the step with the smallest relative deviation from the provided
+    value (ties are resolved in favor of the step listed first)
+    """
+    values, steps, positions = lookup
+    if not values:
+        return None
+    if value < 0:
+        # the deviation shrinks as the step's value grows
+        return steps[-1]
+    if value == 0:
+        # all steps deviate by 100%
+        return steps[positions.index(min(positions))]
+    # the deviation grows the further a step's value is away from the
+    # provided value -> the closest step must be one of its neighbors
+    index = bisect.bisect_left(values, value)
+    candidates = [i for i in (index - 1, index) if 0 <= i < len(values)]
+    closest = min(candidates, key=lambda i: (abs(1 - value / values[i]), positions[i]))
+    return steps[closest]
+
+
+def _convert_percent2step(percent_lookup: _StepLookup, percent: int) -> int:
     """
     find the closest step for the provided value
     """
-    step_cur = 0  # start value is irrelevant
-    deviation_cur = None
-    for step_new, (percent_step, _) in fan_config.steps.items():
-        if percent_step == 0:
-            percent_step = 1
-        deviation_new = abs(1 - percent / percent_step)
-        if deviation_cur is None or deviation_new < deviation_cur:
-            step_cur = step_new
-            deviation_cur = deviation_new
-    return step_cur
-
-
-def _convert_rpm2step(fan_config: FanConfig, rpm: int) -> int | None:
+    step = _find_closest_step(percent_lookup, percent)
+    return step if step is not None else 0  # fallback is irrelevant
+
+
+def _convert_rpm2step(rpm_lookup: _StepLookup, rpm: int) -> int | None:
     """
     find the closest step for the provided value
+    (returns 'None' if none of the steps has an RPM value)
     """
-    step_cur = None
-    deviation_cur = None
-    for step_new, (_, rpm_step) in fan_config.steps.items():
-        if rpm_step is not None:
-            if rpm_step == 0:
-                rpm_step = 1
-            deviation_new = abs(1 - rpm / rpm_step)
-            if deviation_cur is None or deviation_new < deviation_cur:
-                step_cur = step_new
-                deviation_cur = deviation_new
-    return step_cur
+    return _find_closest_step(rpm_lookup, rpm)
 
 
 def _convert_step2percent(fan_config: FanConfig, step: int) -> int:
@@ -215,5 +247,5 @@ def _convert_step2rpm(fan_config: FanConfig, step: int) -> int | None:
     return fan_config.steps[step][1]
 
 
-def _is_valid_step(fan_config: FanConfig, value: int) -> bool:
-    return value in fan_config.steps.keys()
+def _is_valid_step(valid_steps: frozenset[int], value: int) -> bool:
+    return value in valid_steps
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
+import functools
 import logging
-import math
 
 LH = logging.getLogger('feeph.emc2101')
 
@@ -12,10 +12,22 @@ def calculate_pwm_factors(pwm_frequency: int) -> tuple[int, int]:
      - this function minimizes PWM_D to allow for maximum resolution (PWM_F)
      - PWM_F maxes out at 31 (0x1F)
     """
+    # the calculation relies on integer arithmetic and the factors are
+    # written to registers -> coerce the frequency (e.g. 22500.0) first
+    return _calculate_pwm_factors(int(pwm_frequency))
+
+
+# pure function over a small set of commonly used frequencies
+# (invalid frequencies raise an exception and are not cached)
+@functools.lru_cache(maxsize=64)
+def _calculate_pwm_factors(pwm_frequency: int) -> tuple[int, int]:
     if 0 <= pwm_frequency <= 180000:
-        value1 = 360000 / (2 * pwm_frequency)
-        pwm_d = math.ceil(value1 / 31)
-        pwm_f = round(value1 / pwm_d)
+        # integer arithmetic only: 360000 / (2 * pwm_frequency) = 180000 / pwm_frequency
+        pwm_d = -(-180000 // (31 * pwm_frequency))  # ceil division
+        pwm_f, remainder = divmod(180000, pwm_d * pwm_frequency)
+        # round half to even (same as round())
+        if 2 * remainder > pwm_d * pwm_frequency or (2 * remainder == pwm_d * pwm_frequency and pwm_f % 2 == 1):
+            pwm_f += 1
         return (pwm_d, pwm_f)
     else:
         raise ValueError("provided frequency is out of range")
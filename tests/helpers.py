@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+helpers shared by the unit tests
+"""
+
+import os
+
+from feeph.i2c import BurstHandle
+
+import feeph.emc2101.core
+from feeph.emc2101.fan_configs import Steps
+
+# read/write registers followed by readonly registers
+REGISTER_TEMPLATE = {
+    **feeph.emc2101.core.DEFAULTS,
+    0x00: 0x14,  # chip temperature
+    0x01: 0x1B,  # external sensor temperature (high byte)
+    0x02: 0x00,  # status register
+    0x0F: 0x00,  # write only register, trigger temperature conversion
+    0x10: 0xE0,  # external sensor temperature (low byte)
+    0x46: 0xFF,  # tacho reading (low byte)
+    0x47: 0xFF,  # tacho reading (high byte)
+    0xFD: 0x16,  # product id
+    0xFE: 0x5D,  # manufacturer id
+    0xFF: 0x02,  # revision
+}
+
+# fan steps used by the PWM-based device tests
+# (shared by all tests, treat as read-only)
+DEFAULT_STEPS: Steps = {
+    # fmt: off
+    #      %   RPM
+    3:  ( 34,  409),  # noqa: E201
+    4:  ( 40,  479),  # noqa: E201
+    5:  ( 44,  526),  # noqa: E201
+    6:  ( 49,  591),  # noqa: E201
+    7:  ( 52,  629),  # noqa: E201
+    8:  ( 58,  697),  # noqa: E201
+    9:  ( 65,  785),  # noqa: E201
+    10: ( 72,  868),  # noqa: E201
+    11: ( 79,  950),  # noqa: E201
+    12: ( 87, 1040),  # noqa: E201
+    13: ( 93, 1113),  # noqa: E201
+    14: (100, 1194),
+    # fmt: on
+}
+
+
+def create_hardware_i2c_bus():
+    """
+    open the I²C bus the EMC2101 is connected to
+    (the bus clock defaults to 100 kHz, use TEST_EMC2101_I2C_HZ to change it)
+    """
+    # only needed when talking to the actual chip
+    # (modules board and busio provide no type hints)
+    import board  # type: ignore  # pylint: disable=import-outside-toplevel
+    import busio  # type: ignore  # pylint: disable=import-outside-toplevel
+    frequency = int(os.environ.get('TEST_EMC2101_I2C_HZ', '100000'))
+    return busio.I2C(scl=board.SCL, sda=board.SDA, frequency=frequency)
+
+
+def read_registers(bh: BurstHandle, register: int, count: int) -> bytes:
+    """
+    read the values of consecutive registers one by one
+    (starting with the provided register)
+    """
+    return bytes(bh.read_register(register + offset) for offset in range(count))
+
+
+def write_registers(bh: BurstHandle, register: int, values: bytes | bytearray):
+    """
+    write the provided values to consecutive registers one by one
+    (starting with the provided register)
+    """
+    for offset, value in enumerate(values):
+        bh.write_register(register + offset, value)
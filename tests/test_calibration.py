@@ -4,13 +4,10 @@
 import os
 import unittest
 
-# modules board and busio provide no type hints
-import board  # type: ignore
-import busio  # type: ignore
 from feeph.i2c import EmulatedI2C
 
 import feeph.emc2101.calibration as sut  # sytem under test
-import feeph.emc2101.core
+from helpers import REGISTER_TEMPLATE, create_hardware_i2c_bus
 
 if os.environ.get('TEST_EMC2101_CHIP', 'n') == 'y':
     HAS_HARDWARE = True
@@ -24,25 +21,13 @@ else:
 # pylint: disable=protected-access
 class TestCalibration(unittest.TestCase):
 
+    i2c_adr = 0x4C
+
     def setUp(self):
-        self.i2c_adr = 0x4C
         if HAS_HARDWARE:
-            self.i2c_bus = busio.I2C(scl=board.SCL, sda=board.SDA)
+            self.i2c_bus = create_hardware_i2c_bus()
         else:
-            # initialize read/write registers
-            registers = feeph.emc2101.core.DEFAULTS.copy()
-            # add readonly registers
-            registers[0x00] = 0x14  # chip temperature
-            registers[0x01] = 0x1B  # external sensor temperature (high byte)
-            registers[0x02] = 0x00  # status register
-            registers[0x0F] = 0x00  # write only register, trigger temperature conversion
-            registers[0x10] = 0xE0  # external sensor temperature (low byte)
-            registers[0x46] = 0xFF  # tacho reading (low byte)
-            registers[0x47] = 0xFF  # tacho reading (high byte)
-            registers[0xFD] = 0x16  # product id
-            registers[0xFE] = 0x5D  # manufacturer id
-            registers[0xFF] = 0x02  # revision
-            self.i2c_bus = EmulatedI2C(state={self.i2c_adr: registers})
+            self.i2c_bus = EmulatedI2C(state={self.i2c_adr: dict(REGISTER_TEMPLATE)})
 
     # def tearDown(self):
     #     # restore original state after each run
@@ -17,11 +17,12 @@ class TestConversions(unittest.TestCase):
             (0x14, 0b1110_0000): 20.90,
         }
         for bytes, temperature in values.items():
-            msb, lsb = bytes
-            computed = convert_bytes2temperature(msb, lsb)
-            expected = temperature
-            # -------------------------------------------------------------
-            self.assertEqual(computed, expected)
+            with self.subTest(bytes=bytes):
+                msb, lsb = bytes
+                computed = convert_bytes2temperature(msb, lsb)
+                expected = temperature
+                # ---------------------------------------------------------
+                self.assertEqual(computed, expected)
 
     def test_convert_temperature2bytes(self):
         values = {
@@ -48,7 +49,8 @@ class TestConversions(unittest.TestCase):
             21.95: (0x16, 0b0000_0000),
         }
         for temperature, bytes in values.items():
-            computed = convert_temperature2bytes(temperature)
-            expected = bytes
-            # -------------------------------------------------------------
-            self.assertEqual(computed, expected)
+            with self.subTest(temperature=temperature):
+                computed = convert_temperature2bytes(temperature)
+                expected = bytes
+                # ---------------------------------------------------------
+                self.assertEqual(computed, expected)
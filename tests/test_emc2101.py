@@ -4,89 +4,88 @@
 import os
 import unittest
 
-# modules board and busio provide no type hints
-import board  # type: ignore
-import busio  # type: ignore
 from feeph.i2c import BurstHandler, EmulatedI2C
 
 import feeph.emc2101.core as sut  # sytem under test
+from helpers import REGISTER_TEMPLATE, create_hardware_i2c_bus
 
 if os.environ.get('TEST_EMC2101_CHIP', 'n') == 'y':
     HAS_HARDWARE = True
 else:
     HAS_HARDWARE = False
 
+_VALID_MANUFACTURER_IDS = frozenset({
+    0x5D,  # SMSC
+})
+_VALID_PRODUCT_IDS = frozenset({
+    0x16,  # EMC2101
+    0x28,  # EMC2101R
+})
+_VALID_REVISIONS = frozenset(range(0x00, 0x17))  # assuming 0..22 are valid values for revision
 
-# pylint: disable=protected-access
-class TestEmc2101(unittest.TestCase):
 
-    def setUp(self):
-        self.i2c_adr = 0x4C
+# the identification registers are read-only
+# -> a single device instance can be shared by all tests in this class
+class TestEmc2101Identity(unittest.TestCase):
+
+    i2c_adr = 0x4C
+
+    @classmethod
+    def setUpClass(cls):
         if HAS_HARDWARE:
-            self.i2c_bus = busio.I2C(scl=board.SCL, sda=board.SDA)
+            i2c_bus = create_hardware_i2c_bus()
         else:
-            # initialize read/write registers
-            registers = sut.DEFAULTS.copy()
-            # add readonly registers
-            registers[0x00] = 0x14  # chip temperature
-            registers[0x01] = 0x1B  # external sensor temperature (high byte)
-            registers[0x02] = 0x00  # status register
-            registers[0x0F] = 0x00  # write only register, trigger temperature conversion
-            registers[0x10] = 0xE0  # external sensor temperature (low byte)
-            registers[0x46] = 0xFF  # tacho reading (low byte)
-            registers[0x47] = 0xFF  # tacho reading (high byte)
-            registers[0xFD] = 0x16  # product id
-            registers[0xFE] = 0x5D  # manufacturer id
-            registers[0xFF] = 0x02  # revision
-            self.i2c_bus = EmulatedI2C(state={self.i2c_adr: registers})
-        self.emc2101 = sut.Emc2101(i2c_bus=self.i2c_bus, config=sut.ConfigRegister())
-        # restore original state after each run
-        # (hardware is not stateless)
-        self.emc2101.reset_device_registers()
-
-    def tearDown(self):
-        # nothing to do
-        pass
+            i2c_bus = EmulatedI2C(state={cls.i2c_adr: dict(REGISTER_TEMPLATE)})
+        cls.emc2101 = sut.Emc2101(i2c_bus=i2c_bus, config=sut.ConfigRegister())
 
     # ---------------------------------------------------------------------
     # hardware details
     # ---------------------------------------------------------------------
 
-    def test_manufacturer_id(self):
-        # -----------------------------------------------------------------
-        computed = self.emc2101.get_manufacturer_id()
-        expected = [
-            0x5D,  # SMSC
-        ]
-        # -----------------------------------------------------------------
-        self.assertIn(computed, expected, f"Got unexpected manufacturer ID '{computed}'.")
-
-    def test_product_id(self):
-        # -----------------------------------------------------------------
-        computed = self.emc2101.get_product_id()
-        expected = [
-            0x16,  # EMC2101
-            0x28,  # EMC2101R
-        ]
-        # -----------------------------------------------------------------
-        self.assertIn(computed, expected, f"Got unexpected product ID '{computed}'.")
-
-    def test_product_revision(self):
-        # -----------------------------------------------------------------
-        computed = self.emc2101.get_product_revision()
-        expected = range(0x00, 0x17)  # assuming 0..22 are valid values for revision
-        # -----------------------------------------------------------------
-        self.assertIn(computed, expected, f"Got unexpected product ID '{computed}'.")
+    def test_hardware_ids(self):
+        cases = (
+            # fmt: off
+            ("get_manufacturer_id",  _VALID_MANUFACTURER_IDS, "manufacturer ID"),
+            ("get_product_id",       _VALID_PRODUCT_IDS,      "product ID"),
+            ("get_product_revision", _VALID_REVISIONS,        "product revision"),
+            # fmt: on
+        )
+        for getter, expected, label in cases:
+            with self.subTest(getter=getter):
+                # ---------------------------------------------------------
+                computed = getattr(self.emc2101, getter)()
+                # ---------------------------------------------------------
+                self.assertIn(computed, expected, f"Got unexpected {label} '{computed}'.")
 
     def test_describe_product(self):
-        mid = self.emc2101.get_manufacturer_id()
-        pid = self.emc2101.get_product_id()
-        rev = self.emc2101.get_product_revision()
         # -----------------------------------------------------------------
         computed = self.emc2101.describe_device()
-        expected = f"SMSC (0x{mid:02X}) EMC2101 (0x{pid:02X}) (rev: {rev})"
+        expected = r"^SMSC \(0x5D\) (EMC2101 \(0x16\)|EMC2101R \(0x28\)) \(rev: \d+\)$"
         # -----------------------------------------------------------------
-        self.assertIn(computed, expected, f"Got unexpected product ID '{computed}'.")
+        self.assertRegex(computed, expected, f"Got unexpected product description '{computed}'.")
+
+
+# pylint: disable=protected-access
+class TestEmc2101(unittest.TestCase):
+
+    i2c_adr = 0x4C
+
+    def setUp(self):
+        if HAS_HARDWARE:
+            self.i2c_bus = create_hardware_i2c_bus()
+        else:
+            self.i2c_bus = EmulatedI2C(state={self.i2c_adr: dict(REGISTER_TEMPLATE)})
+        self.emc2101 = sut.Emc2101(i2c_bus=self.i2c_bus, config=sut.ConfigRegister())
+        if HAS_HARDWARE:
+            # restore original state after each run
+            # (hardware is not stateless)
+            self.emc2101.reset_device_registers()
+        # else: the emulated register map was freshly built from DEFAULTS
+        #       and the default config register matches it -> no reset needed
+
+    def tearDown(self):
+        # nothing to do
+        pass
 
     # ---------------------------------------------------------------------
     # circuit-dependent settings
@@ -118,8 +117,8 @@ class TestEmc2101(unittest.TestCase):
         self.assertEqual(computed, expected)
         with BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=self.i2c_adr) as bh:
             self.assertEqual(bh.read_register(0x03), 0b0000_0000)
-            self.assertEqual(bh.read_register(0x4D), 0x34)
-            self.assertEqual(bh.read_register(0x4E), 0x12)
+            self.assertEqual(bh.read_register(0x4D), 0x34)  # pwm frequency
+            self.assertEqual(bh.read_register(0x4E), 0x12)  # pwm frequency divide
 
     def test_configure_pwm_control_2(self):
         with BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=self.i2c_adr) as bh:
@@ -133,8 +132,8 @@ class TestEmc2101(unittest.TestCase):
         self.assertEqual(computed, expected)
         with BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=self.i2c_adr) as bh:
             self.assertEqual(bh.read_register(0x03), 0b0001_0000)
-            self.assertEqual(bh.read_register(0x4D), 0x17)
-            self.assertEqual(bh.read_register(0x4E), 0x01)
+            self.assertEqual(bh.read_register(0x4D), 0x17)  # pwm frequency
+            self.assertEqual(bh.read_register(0x4E), 0x01)  # pwm frequency divide
 
     def test_configure_spinup_behaviour_1(self):
         spinup_duration = sut.SpinUpDuration.TIME_0_80    # 0b...._.101
@@ -178,13 +177,6 @@ class TestEmc2101(unittest.TestCase):
             self.assertEqual(bh.read_register(0x03), 0b0000_0000)
             self.assertEqual(bh.read_register(0x4B), 0b0011_1111)
 
-    def test_set_minimum_rpm_too_low(self):
-        # due to the way EMC2101's registers are implemented the measured
-        # RPM can never be lower than 82 RPM
-        # -----------------------------------------------------------------
-        # -----------------------------------------------------------------
-        self.assertRaises(ValueError, self.emc2101.configure_minimum_rpm, 80)
-
     def test_get_driver_strength(self):
         # -----------------------------------------------------------------
         computed = self.emc2101.get_driver_strength()
@@ -210,38 +202,6 @@ class TestEmc2101(unittest.TestCase):
         with BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=self.i2c_adr) as bh:
             self.assertEqual(bh.read_register(0x4C), 0)
 
-    def test_update_lookup_table_step_too_low(self):
-        lut = {
-            20: -1,
-        }
-        # -----------------------------------------------------------------
-        # -----------------------------------------------------------------
-        self.assertRaises(ValueError, self.emc2101.update_lookup_table, values=lut)
-
-    def test_update_lookup_table_step_too_high(self):
-        lut = {
-            20: 64,
-        }
-        # -----------------------------------------------------------------
-        # -----------------------------------------------------------------
-        self.assertRaises(ValueError, self.emc2101.update_lookup_table, values=lut)
-
-    def test_update_lookup_table_temp_too_low(self):
-        lut = {
-            -1: 40,
-        }
-        # -----------------------------------------------------------------
-        # -----------------------------------------------------------------
-        self.assertRaises(ValueError, self.emc2101.update_lookup_table, values=lut)
-
-    def test_update_lookup_table_temp_too_high(self):
-        lut = {
-            101: 40,
-        }
-        # -----------------------------------------------------------------
-        # -----------------------------------------------------------------
-        self.assertRaises(ValueError, self.emc2101.update_lookup_table, values=lut)
-
     # ---------------------------------------------------------------------
     # convenience functions
     # ---------------------------------------------------------------------
@@ -3,67 +3,52 @@
 
 import os
 import unittest
-from unittest.mock import MagicMock, call
 
-# modules board and busio provide no type hints
-import board  # type: ignore
-import busio  # type: ignore
 from feeph.i2c import BurstHandler, EmulatedI2C
 
-import feeph.emc2101.core
 import feeph.emc2101.pwm as sut  # sytem under test
+from helpers import DEFAULT_STEPS, REGISTER_TEMPLATE, create_hardware_i2c_bus
 
 if os.environ.get('TEST_EMC2101_CHIP', 'n') == 'y':
     HAS_HARDWARE = True
 else:
     HAS_HARDWARE = False
 
+# supported temperature conversion rates, ordered from slowest to fastest
+_CONVERSION_RATES = ("1/16", "1/8", "1/4", "1/2", "1", "2", "4", "8", "16", "32")
+
+
+def _record_writeto(i2c_bus) -> list[dict]:
+    """
+    replace the bus' writeto() method with a recorder and return the
+    list of recorded calls
+    """
+    calls: list[dict] = []
+    i2c_bus.writeto = lambda **kwargs: calls.append(kwargs)
+    return calls
+
 
 # pylint: disable=too-many-public-methods,protected-access
 class TestEmc2101PWM(unittest.TestCase):
 
+    i2c_adr = 0x4C
+
+    @classmethod
+    def setUpClass(cls):
+        cls._device_config = sut.DeviceConfig(rpm_control_mode=sut.RpmControlMode.PWM, pin_six_mode=sut.PinSixMode.TACHO)
+        cls._fan_config = sut.FanConfig(model="Mockinator 2000", pwm_frequency=22500, rpm_control_mode=sut.RpmControlMode.PWM, minimum_duty_cycle=20, maximum_duty_cycle=100, minimum_rpm=100, maximum_rpm=2000, steps=DEFAULT_STEPS)
+
     def setUp(self):
-        self.i2c_adr = 0x4C
         if HAS_HARDWARE:
-            self.i2c_bus = busio.I2C(scl=board.SCL, sda=board.SDA)
+            self.i2c_bus = create_hardware_i2c_bus()
         else:
-            # initialize read/write registers
-            registers = feeph.emc2101.core.DEFAULTS.copy()
-            # add readonly registers
-            registers[0x00] = 0x14  # chip temperature
-            registers[0x01] = 0x1B  # external sensor temperature (high byte)
-            registers[0x02] = 0x00  # status register
-            registers[0x0F] = 0x00  # write only register, trigger temperature conversion
-            registers[0x10] = 0xE0  # external sensor temperature (low byte)
-            registers[0x46] = 0xFF  # tacho reading (low byte)
-            registers[0x47] = 0xFF  # tacho reading (high byte)
-            registers[0xFD] = 0x16  # product id
-            registers[0xFE] = 0x5D  # manufacturer id
-            registers[0xFF] = 0x02  # revision
-            self.i2c_bus = EmulatedI2C(state={self.i2c_adr: registers})
-        device_config = sut.DeviceConfig(rpm_control_mode=sut.RpmControlMode.PWM, pin_six_mode=sut.PinSixMode.TACHO)
-        steps = {
-            # fmt: off
-            #      %   RPM
-            3:  ( 34,  409),  # noqa: E201
-            4:  ( 40,  479),  # noqa: E201
-            5:  ( 44,  526),  # noqa: E201
-            6:  ( 49,  591),  # noqa: E201
-            7:  ( 52,  629),  # noqa: E201
-            8:  ( 58,  697),  # noqa: E201
-            9:  ( 65,  785),  # noqa: E201
-            10: ( 72,  868),  # noqa: E201
-            11: ( 79,  950),  # noqa: E201
-            12: ( 87, 1040),  # noqa: E201
-            13: ( 93, 1113),  # noqa: E201
-            14: (100, 1194),
-            # fmt: on
-        }
-        self.fan_config = sut.FanConfig(model="Mockinator 2000", pwm_frequency=22500, rpm_control_mode=sut.RpmControlMode.PWM, minimum_duty_cycle=20, maximum_duty_cycle=100, minimum_rpm=100, maximum_rpm=2000, steps=steps)
-        self.emc2101 = sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=device_config, fan_config=self.fan_config)
-        # restore original state after each run
-        # (hardware is not stateless)
-        self.emc2101.reset_device_registers()
+            # every test starts with a pristine register map
+            self.i2c_bus = EmulatedI2C(state={self.i2c_adr: dict(REGISTER_TEMPLATE)})
+        self.emc2101 = sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=self._device_config, fan_config=self._fan_config)
+        if HAS_HARDWARE:
+            # restore original state after each run
+            # (hardware is not stateless)
+            self.emc2101.reset_device_registers()
 
     def tearDown(self):
         # nothing to do
@@ -91,10 +76,10 @@ class TestEmc2101PWM(unittest.TestCase):
 
     def test_get_temperature_conversion_rates(self):
         # -----------------------------------------------------------------
-        computed = sorted(self.emc2101.get_temperature_conversion_rates())
-        expected = sorted(["1/16", "1/8", "1/4", "1/2", "1", "2", "4", "8", "16", "32"])
+        computed = self.emc2101.get_temperature_conversion_rates()
+        expected = _CONVERSION_RATES
         # -----------------------------------------------------------------
-        self.assertEqual(computed, expected, f"Got unexpected temperature conversion rates '{computed}'.")
+        self.assertEqual(tuple(computed), expected, f"Got unexpected temperature conversion rates '{computed}'.")
 
     # ---------------------------------------------------------------------
     # temperature measurements
@@ -112,13 +97,14 @@ class TestEmc2101PWM(unittest.TestCase):
     #   Writing to this register initiates a one shot update of the
     #   temperature data. Data is not relevant and is not stored.
     def test_force_temperature_conversion(self):
-        # we use a mock since there is no other way to observe this change
-        self.i2c_bus.writeto = MagicMock(name='writeto')
+        # we record the calls since there is no other way to observe this change
+        calls = _record_writeto(self.i2c_bus)
+        self.addCleanup(delattr, self.i2c_bus, 'writeto')
         # -----------------------------------------------------------------
         self.emc2101.force_temperature_conversion()
-        computed = self.i2c_bus.writeto.mock_calls
+        computed = calls
         expected = [
-            call(address=self.i2c_adr, buffer=bytearray([0x0F, 0x00])),
+            {'address': self.i2c_adr, 'buffer': bytes([0x0F, 0x00])},
         ]
         # -----------------------------------------------------------------
         self.assertEqual(computed, expected)
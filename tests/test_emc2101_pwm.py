@@ -4,126 +4,167 @@
 import os
 import unittest
 
-# modules board and busio provide no type hints
-import board  # type: ignore
-import busio  # type: ignore
 from feeph.i2c import BurstHandler, EmulatedI2C
 
-import feeph.emc2101.core
 import feeph.emc2101.pwm as sut  # sytem under test
+from feeph.emc2101.fan_configs import Steps
+from helpers import DEFAULT_STEPS, REGISTER_TEMPLATE, create_hardware_i2c_bus, read_registers
 
 if os.environ.get('TEST_EMC2101_CHIP', 'n') == 'y':
     HAS_HARDWARE = True
 else:
     HAS_HARDWARE = False
 
+# device configurations used by the tests
+_DEVCFG_PWM_ALERT = sut.DeviceConfig(rpm_control_mode=sut.RpmControlMode.PWM, pin_six_mode=sut.PinSixMode.ALERT)
+_DEVCFG_PWM_TACHO = sut.DeviceConfig(rpm_control_mode=sut.RpmControlMode.PWM, pin_six_mode=sut.PinSixMode.TACHO)
+
+
+def _make_fan_config(rpm_control_mode: sut.RpmControlMode = sut.RpmControlMode.PWM, steps: Steps | None = None) -> sut.FanConfig:
+    """
+    build the fan configuration used by the tests
+    (all tests share the same fan, only the control mode and steps vary)
+    """
+    return sut.FanConfig(model="Mockinator 2000", rpm_control_mode=rpm_control_mode, pwm_frequency=22500, minimum_duty_cycle=20, maximum_duty_cycle=100, minimum_rpm=100, maximum_rpm=2000, steps=steps)
+
+
+def _skip_default_emc2101(test_method):
+    """
+    mark a test that only exercises the constructor
+
+    setUp builds a new default instance for every test and constructing it
+    writes the configuration registers. These tests never use that instance,
+    so setUp skips building it (and the register writes it would cause).
+    """
+    test_method.skip_default_emc2101 = True
+    return test_method
+
+
+def _needs_reset(test_method):
+    """
+    mark a test that depends on registers it does not write itself
+
+    On hardware the chip is only reset before these tests. Tests without
+    this marker must write every register they read.
+    """
+    test_method.needs_reset = True
+    return test_method
+
 
 # pylint: disable=too-many-public-methods,protected-access
 class TestEmc2101PWM(unittest.TestCase):
 
-    def setUp(self):
-        self.i2c_adr = 0x4C
+    i2c_adr = 0x4C
+
+    @classmethod
+    def setUpClass(cls):
+        # the default configuration is identical for all tests
+        # -> build it once
+        cls.device_config = _DEVCFG_PWM_TACHO
+        cls.fan_config = _make_fan_config(steps=DEFAULT_STEPS)
         if HAS_HARDWARE:
-            self.i2c_bus = busio.I2C(scl=board.SCL, sda=board.SDA)
-        else:
-            # initialize read/write registers
-            registers = feeph.emc2101.core.DEFAULTS.copy()
-            # add readonly registers
-            registers[0x00] = 0x14  # chip temperature
-            registers[0x01] = 0x1B  # external sensor temperature (high byte)
-            registers[0x02] = 0x00  # status register
-            registers[0x0F] = 0x00  # write only register, trigger temperature conversion
-            registers[0x10] = 0xE0  # external sensor temperature (low byte)
-            registers[0x46] = 0xFF  # tacho reading (low byte)
-            registers[0x47] = 0xFF  # tacho reading (high byte)
-            registers[0xFD] = 0x16  # product id
-            registers[0xFE] = 0x5D  # manufacturer id
-            registers[0xFF] = 0x02  # revision
-            self.i2c_bus = EmulatedI2C(state={self.i2c_adr: registers})
-        device_config = sut.DeviceConfig(rpm_control_mode=sut.RpmControlMode.PWM, pin_six_mode=sut.PinSixMode.TACHO)
-        steps = {
-            # fmt: off
-            #      %   RPM
-            3:  ( 34,  409),  # noqa: E201
-            4:  ( 40,  479),  # noqa: E201
-            5:  ( 44,  526),  # noqa: E201
-            6:  ( 49,  591),  # noqa: E201
-            7:  ( 52,  629),  # noqa: E201
-            8:  ( 58,  697),  # noqa: E201
-            9:  ( 65,  785),  # noqa: E201
-            10: ( 72,  868),  # noqa: E201
-            11: ( 79,  950),  # noqa: E201
-            12: ( 87, 1040),  # noqa: E201
-            13: ( 93, 1113),  # noqa: E201
-            14: (100, 1194),
-            # fmt: on
-        }
-        self.fan_config = sut.FanConfig(model="Mockinator 2000", pwm_frequency=22500, rpm_control_mode=sut.RpmControlMode.PWM, minimum_duty_cycle=20, maximum_duty_cycle=100, minimum_rpm=100, maximum_rpm=2000, steps=steps)
-        self.emc2101 = sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=device_config, fan_config=self.fan_config)
-        # restore original state after each run
-        # (hardware is not stateless)
-        self.emc2101.reset_device_registers()
+            # opening the bus is expensive -> share it across all tests
+            cls._hardware_i2c_bus = create_hardware_i2c_bus()
+            cls.addClassCleanup(cls._hardware_i2c_bus.deinit)
+            # start and end with a freshly reset chip; individual tests
+            # only reset it again if they depend on untouched registers
+            emc2101 = sut.Emc2101_PWM(i2c_bus=cls._hardware_i2c_bus, device_config=cls.device_config, fan_config=cls.fan_config)
+            emc2101.reset_device_registers()
+            cls.addClassCleanup(emc2101.reset_device_registers)
+
+    def _set_up_hardware(self):
+        self.i2c_bus = self._hardware_i2c_bus
+        if getattr(getattr(self, self._testMethodName), 'skip_default_emc2101', False):
+            return
+        self.emc2101 = sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=self.device_config, fan_config=self.fan_config)
+        if getattr(getattr(self, self._testMethodName), 'needs_reset', False):
+            # restore original state
+            # (hardware is not stateless)
+            self.emc2101.reset_device_registers()
+
+    def _set_up_emulated(self):
+        # every test starts with a pristine register map
+        self.i2c_bus = EmulatedI2C(state={self.i2c_adr: REGISTER_TEMPLATE.copy()})
+        if getattr(getattr(self, self._testMethodName), 'skip_default_emc2101', False):
+            return
+        self.emc2101 = sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=self.device_config, fan_config=self.fan_config)
+
+    # the test environment does not change during a run
+    # -> select the matching setup once instead of branching in every test
+    setUp = _set_up_hardware if HAS_HARDWARE else _set_up_emulated
 
     def tearDown(self):
         # nothing to do
         pass
 
+    def _seed_registers(self, values: dict[int, int]):
+        """
+        write the provided register values
+        """
+        with BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=self.i2c_adr) as bh:
+            for register, value in values.items():
+                bh.write_register(register, value)
+
     # ---------------------------------------------------------------------
     # initialization
     # ---------------------------------------------------------------------
 
     def test_configure_pin6_alert(self):
-        device_config = sut.DeviceConfig(rpm_control_mode=sut.RpmControlMode.PWM, pin_six_mode=sut.PinSixMode.ALERT)
-        emc2101 = sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=device_config, fan_config=self.fan_config)
+        emc2101 = sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=_DEVCFG_PWM_ALERT, fan_config=self.fan_config)
         # -----------------------------------------------------------------
-        computed = emc2101.get_config_register()
-        expected = sut.ConfigRegister(alt_tach=False)
+        computed = emc2101.get_config_register().as_int()
+        expected = 0b0000_0000  # alt_tach=False, all other flags disabled
         # -----------------------------------------------------------------
         self.assertEqual(computed, expected)
 
     def test_configure_pin6_tacho(self):
-        device_config = sut.DeviceConfig(rpm_control_mode=sut.RpmControlMode.PWM, pin_six_mode=sut.PinSixMode.TACHO)
-        emc2101 = sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=device_config, fan_config=self.fan_config)
+        emc2101 = sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=_DEVCFG_PWM_TACHO, fan_config=self.fan_config)
         # -----------------------------------------------------------------
-        computed = emc2101.get_config_register()
-        expected = sut.ConfigRegister(alt_tach=True)
+        computed = emc2101.get_config_register().as_int()
+        expected = 0b0000_0100  # alt_tach=True, all other flags disabled
         # -----------------------------------------------------------------
         self.assertEqual(computed, expected)
 
+    @_skip_default_emc2101
     def test_configure_pin6_invalid(self):
         device_config = sut.DeviceConfig(rpm_control_mode=sut.RpmControlMode.PWM, pin_six_mode=None)
         # -----------------------------------------------------------------
         # -----------------------------------------------------------------
-        self.assertRaises(NotImplementedError, sut.Emc2101_PWM, i2c_bus=self.i2c_bus, device_config=device_config, fan_config=self.fan_config)
+        with self.assertRaises(NotImplementedError):
+            sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=device_config, fan_config=self.fan_config)
 
+    @_skip_default_emc2101
     def test_configure_control_mode_mismatch(self):
         # fan device and controller must both agree on how to control the
         # fan's speed
-        fan_config = sut.FanConfig(model="Mockinator 2000", pwm_frequency=22500, rpm_control_mode=sut.RpmControlMode.VOLTAGE, minimum_duty_cycle=20, maximum_duty_cycle=100, minimum_rpm=100, maximum_rpm=2000, steps={})
-        device_config = sut.DeviceConfig(rpm_control_mode=sut.RpmControlMode.PWM, pin_six_mode=sut.PinSixMode.TACHO)
+        fan_config = _make_fan_config(rpm_control_mode=sut.RpmControlMode.VOLTAGE, steps={})
         # -----------------------------------------------------------------
         # -----------------------------------------------------------------
-        self.assertRaises(ValueError, sut.Emc2101_PWM, i2c_bus=self.i2c_bus, device_config=device_config, fan_config=fan_config)
+        with self.assertRaises(ValueError):
+            sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=_DEVCFG_PWM_TACHO, fan_config=fan_config)
 
+    @_skip_default_emc2101
     def test_configure_control_mode_unknown(self):
-        fan_config = sut.FanConfig(model="Mockinator 2000", pwm_frequency=22500, rpm_control_mode=None, minimum_duty_cycle=20, maximum_duty_cycle=100, minimum_rpm=100, maximum_rpm=2000, steps={})
-        device_config = sut.DeviceConfig(rpm_control_mode=sut.RpmControlMode.PWM, pin_six_mode=sut.PinSixMode.TACHO)
+        fan_config = _make_fan_config(rpm_control_mode=None, steps={})
         # -----------------------------------------------------------------
         # -----------------------------------------------------------------
-        self.assertRaises(ValueError, sut.Emc2101_PWM, i2c_bus=self.i2c_bus, device_config=device_config, fan_config=fan_config)
+        with self.assertRaises(ValueError):
+            sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=_DEVCFG_PWM_TACHO, fan_config=fan_config)
 
+    @_skip_default_emc2101
     def test_no_steps_defined(self):
-        device_config = sut.DeviceConfig(rpm_control_mode=sut.RpmControlMode.PWM, pin_six_mode=sut.PinSixMode.TACHO)
         # no steps defined in fan config
-        fan_config = sut.FanConfig(model="Mockinator 2000", pwm_frequency=22500, rpm_control_mode=sut.RpmControlMode.PWM, minimum_duty_cycle=20, maximum_duty_cycle=100, minimum_rpm=100, maximum_rpm=2000)
+        fan_config = _make_fan_config()
         # -----------------------------------------------------------------
         # -----------------------------------------------------------------
-        self.assertRaises(ValueError, sut.Emc2101_PWM, i2c_bus=self.i2c_bus, device_config=device_config, fan_config=fan_config)
+        with self.assertRaises(ValueError):
+            sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=_DEVCFG_PWM_TACHO, fan_config=fan_config)
 
     # ---------------------------------------------------------------------
     # control fan speed (manually)
     # ---------------------------------------------------------------------
 
+    @_needs_reset
     def test_get_fixed_speed(self):
         # -----------------------------------------------------------------
         computed = self.emc2101.get_fixed_speed(unit=sut.FanSpeedUnit.STEP)
@@ -134,15 +175,15 @@ class TestEmc2101PWM(unittest.TestCase):
     def test_set_fixed_speed_invalid(self):
         # -----------------------------------------------------------------
         # -----------------------------------------------------------------
-        self.assertRaises(ValueError, self.emc2101.set_fixed_speed, value=0, unit=None)
+        with self.assertRaises(ValueError):
+            self.emc2101.set_fixed_speed(value=0, unit=None)
 
     def test_set_fixed_speed_percent_zero(self):
-        device_config = sut.DeviceConfig(rpm_control_mode=sut.RpmControlMode.PWM, pin_six_mode=sut.PinSixMode.TACHO)
         steps = {
             0: (0, 0),
         }
-        fan_config = sut.FanConfig(model="Mockinator 2000", pwm_frequency=22500, rpm_control_mode=sut.RpmControlMode.PWM, minimum_duty_cycle=20, maximum_duty_cycle=100, minimum_rpm=100, maximum_rpm=2000, steps=steps)
-        emc2101 = sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=device_config, fan_config=fan_config)
+        fan_config = _make_fan_config(steps=steps)
+        emc2101 = sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=_DEVCFG_PWM_TACHO, fan_config=fan_config)
         # -----------------------------------------------------------------
         computed = emc2101.set_fixed_speed(1, unit=sut.FanSpeedUnit.PERCENT)
         expected = 0
@@ -152,15 +193,15 @@ class TestEmc2101PWM(unittest.TestCase):
     def test_set_fixed_speed_percent_invalid(self):
         # -----------------------------------------------------------------
         # -----------------------------------------------------------------
-        self.assertRaises(ValueError, self.emc2101.set_fixed_speed, value=101, unit=sut.FanSpeedUnit.PERCENT)
+        with self.assertRaises(ValueError):
+            self.emc2101.set_fixed_speed(value=101, unit=sut.FanSpeedUnit.PERCENT)
 
     def test_set_fixed_speed_rpm_zero(self):
-        device_config = sut.DeviceConfig(rpm_control_mode=sut.RpmControlMode.PWM, pin_six_mode=sut.PinSixMode.TACHO)
         steps = {
             0: (0, 0),
         }
-        fan_config = sut.FanConfig(model="Mockinator 2000", pwm_frequency=22500, rpm_control_mode=sut.RpmControlMode.PWM, minimum_duty_cycle=20, maximum_duty_cycle=100, minimum_rpm=100, maximum_rpm=2000, steps=steps)
-        emc2101 = sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=device_config, fan_config=fan_config)
+        fan_config = _make_fan_config(steps=steps)
+        emc2101 = sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=_DEVCFG_PWM_TACHO, fan_config=fan_config)
         # -----------------------------------------------------------------
         computed = emc2101.set_fixed_speed(1, unit=sut.FanSpeedUnit.RPM)
         expected = 0
@@ -168,12 +209,11 @@ class TestEmc2101PWM(unittest.TestCase):
         self.assertEqual(computed, expected)
 
     def test_set_fixed_speed_rpm_none(self):
-        device_config = sut.DeviceConfig(rpm_control_mode=sut.RpmControlMode.PWM, pin_six_mode=sut.PinSixMode.ALERT)
         steps = {
             0: (0, None),
         }
-        fan_config = sut.FanConfig(model="Mockinator 2000", pwm_frequency=22500, rpm_control_mode=sut.RpmControlMode.PWM, minimum_duty_cycle=20, maximum_duty_cycle=100, minimum_rpm=100, maximum_rpm=2000, steps=steps)
-        emc2101 = sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=device_config, fan_config=fan_config)
+        fan_config = _make_fan_config(steps=steps)
+        emc2101 = sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=_DEVCFG_PWM_ALERT, fan_config=fan_config)
         # -----------------------------------------------------------------
         computed = emc2101.set_fixed_speed(1, unit=sut.FanSpeedUnit.RPM)
         expected = None
@@ -183,25 +223,44 @@ class TestEmc2101PWM(unittest.TestCase):
     def test_set_fixed_speed_rpm_invalid(self):
         # -----------------------------------------------------------------
         # -----------------------------------------------------------------
-        self.assertRaises(ValueError, self.emc2101.set_fixed_speed, value=-1, unit=sut.FanSpeedUnit.RPM)
+        with self.assertRaises(ValueError):
+            self.emc2101.set_fixed_speed(value=-1, unit=sut.FanSpeedUnit.RPM)
 
     def test_set_fixed_speed_step_invalid(self):
         # -----------------------------------------------------------------
         # -----------------------------------------------------------------
-        self.assertRaises(ValueError, self.emc2101.set_fixed_speed, value=-1, unit=sut.FanSpeedUnit.STEP)
+        with self.assertRaises(ValueError):
+            self.emc2101.set_fixed_speed(value=-1, unit=sut.FanSpeedUnit.STEP)
 
     # control duty cycle using manual control
 
-    def test_duty_cycle_read_steps(self):
-        with BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=self.i2c_adr) as bh:
-            bh.write_register(0x4A, 0b0010_0000)  # enable manual control
-            bh.write_register(0x4C, 0x08)         # number of steps depends on pwm frequency
-        # -----------------------------------------------------------------
-        computed = self.emc2101.get_fixed_speed(unit=sut.FanSpeedUnit.STEP)
-        expected = 8
-        # -----------------------------------------------------------------
-        self.assertEqual(computed, expected)
-
+    def test_duty_cycle_read(self):
+        self._seed_registers({
+            0x4A: 0b0010_0000,  # enable manual control
+            0x4C: 0x08,         # number of steps depends on pwm frequency
+        })
+        # reading the duty cycle does not alter the device's state
+        # -> all units can be checked against the same register values
+        with self.subTest(unit=sut.FanSpeedUnit.STEP):
+            # -------------------------------------------------------------
+            computed = self.emc2101.get_fixed_speed(unit=sut.FanSpeedUnit.STEP)
+            expected = 8
+            # -------------------------------------------------------------
+            self.assertEqual(computed, expected)
+        with self.subTest(unit=sut.FanSpeedUnit.PERCENT):
+            # -------------------------------------------------------------
+            computed = self.emc2101.get_fixed_speed(unit=sut.FanSpeedUnit.PERCENT)
+            expected = 58
+            # -------------------------------------------------------------
+            self.assertEqual(computed, expected)
+        with self.subTest(unit=sut.FanSpeedUnit.RPM):
+            # -------------------------------------------------------------
+            computed = self.emc2101.get_fixed_speed(unit=sut.FanSpeedUnit.RPM)
+            expected = self.fan_config.maximum_rpm
+            # -------------------------------------------------------------
+            self.assertLessEqual(computed, expected)
+
+    @_needs_reset
     def test_duty_cycle_write_steps(self):
         # -----------------------------------------------------------------
         computed = self.emc2101.set_fixed_speed(8, unit=sut.FanSpeedUnit.STEP)  # number of steps depends on pwm frequency
@@ -213,18 +272,10 @@ class TestEmc2101PWM(unittest.TestCase):
             self.assertEqual(bh.read_register(0x4C), 0x08)         # number of steps depends on pwm frequency
 
     def test_duty_cycle_write_steps_oor(self):
-        self.assertRaises(ValueError, self.emc2101.set_fixed_speed, 20, unit=sut.FanSpeedUnit.STEP)
-
-    def test_duty_cycle_read_percent(self):
-        with BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=self.i2c_adr) as bh:
-            bh.write_register(0x4A, 0b0010_0000)  # enable manual control
-            bh.write_register(0x4C, 0x08)         # number of steps depends on pwm frequency
-        # -----------------------------------------------------------------
-        computed = self.emc2101.get_fixed_speed(unit=sut.FanSpeedUnit.PERCENT)
-        expected = 58
-        # -----------------------------------------------------------------
-        self.assertEqual(computed, expected)
+        with self.assertRaises(ValueError):
+            self.emc2101.set_fixed_speed(20, unit=sut.FanSpeedUnit.STEP)
 
+    @_needs_reset
     def test_duty_cycle_write_percent(self):
         # -----------------------------------------------------------------
         computed = self.emc2101.set_fixed_speed(72)  # 0..100 percent
@@ -236,18 +287,10 @@ class TestEmc2101PWM(unittest.TestCase):
             self.assertEqual(bh.read_register(0x4C), 0x0A)         # number of steps depends on pwm frequency
 
     def test_duty_cycle_write_percent_oor(self):
-        self.assertRaises(ValueError, self.emc2101.set_fixed_speed, 105)
-
-    def test_duty_cycle_read_rpm(self):
-        with BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=self.i2c_adr) as bh:
-            bh.write_register(0x4A, 0b0010_0000)  # enable manual control
-            bh.write_register(0x4C, 0x08)         # number of steps depends on pwm frequency
-        # -----------------------------------------------------------------
-        computed = self.emc2101.get_fixed_speed(unit=sut.FanSpeedUnit.RPM)
-        expected = self.fan_config.maximum_rpm
-        # -----------------------------------------------------------------
-        self.assertLessEqual(computed, expected)
+        with self.assertRaises(ValueError):
+            self.emc2101.set_fixed_speed(105)
 
+    @_needs_reset
     def test_duty_cycle_write_rpm(self):
         # -----------------------------------------------------------------
         computed = self.emc2101.set_fixed_speed(868, unit=sut.FanSpeedUnit.RPM)  # 0..max_rpm
@@ -259,7 +302,8 @@ class TestEmc2101PWM(unittest.TestCase):
             self.assertEqual(bh.read_register(0x4C), 0x0A)         # number of steps depends on pwm frequency
 
     def test_duty_cycle_write_rpm_oor(self):
-        self.assertRaises(ValueError, self.emc2101.set_fixed_speed, 2500)
+        with self.assertRaises(ValueError):
+            self.emc2101.set_fixed_speed(2500)
 
     # ---------------------------------------------------------------------
     # lookup table - extended functionality
@@ -277,12 +321,7 @@ class TestEmc2101PWM(unittest.TestCase):
         # -----------------------------------------------------------------
         self.assertEqual(computed, expected)  # update was performed
         with BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=self.i2c_adr) as bh:
-            self.assertEqual(bh.read_register(0x50), 16)
-            self.assertEqual(bh.read_register(0x51), 0x03)
-            self.assertEqual(bh.read_register(0x52), 40)
-            self.assertEqual(bh.read_register(0x53), 0x08)
-            self.assertEqual(bh.read_register(0x54), 72)
-            self.assertEqual(bh.read_register(0x55), 0x0D)
+            self.assertEqual(read_registers(bh, 0x50, 16), bytes([16, 0x03, 40, 0x08, 72, 0x0D]) + bytes(10))
 
     def test_update_lookup_table_step_invalid(self):
         values = {
@@ -296,10 +335,7 @@ class TestEmc2101PWM(unittest.TestCase):
         # -----------------------------------------------------------------
         self.assertEqual(computed, expected)  # update was performed
         with BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=self.i2c_adr) as bh:
-            self.assertEqual(bh.read_register(0x50), 16)
-            self.assertEqual(bh.read_register(0x51), 0x03)
-            self.assertEqual(bh.read_register(0x52), 72)
-            self.assertEqual(bh.read_register(0x53), 0x0D)
+            self.assertEqual(read_registers(bh, 0x50, 16), bytes([16, 0x03, 72, 0x0D]) + bytes(12))
 
     def test_update_lookup_table_percent(self):
         values = {
@@ -313,40 +349,27 @@ class TestEmc2101PWM(unittest.TestCase):
         # -----------------------------------------------------------------
         self.assertEqual(computed, expected)  # update was performed
         with BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=self.i2c_adr) as bh:
-            self.assertEqual(bh.read_register(0x50), 16)
-            self.assertEqual(bh.read_register(0x51), 0x03)
-            self.assertEqual(bh.read_register(0x52), 40)
-            self.assertEqual(bh.read_register(0x53), 0x08)
-            self.assertEqual(bh.read_register(0x54), 72)
-            self.assertEqual(bh.read_register(0x55), 0x0D)
+            self.assertEqual(read_registers(bh, 0x50, 16), bytes([16, 0x03, 40, 0x08, 72, 0x0D]) + bytes(10))
 
     # TODO properly validate the percentage range and perform suitable action
-    def test_update_lookup_table_percent_too_low(self):
-        values = {
-            16: -1,
-        }
-        # -----------------------------------------------------------------
-        computed = self.emc2101.update_lookup_table(values=values, unit=sut.FanSpeedUnit.PERCENT)
-        expected = True
-        # -----------------------------------------------------------------
-        self.assertEqual(computed, expected)  # update was performed
-        with BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=self.i2c_adr) as bh:
-            self.assertEqual(bh.read_register(0x50), 16)
-            self.assertEqual(bh.read_register(0x51), 0x0E)
-
-    # TODO properly validate the percentage range and perform suitable action
-    def test_update_lookup_table_percent_too_high(self):
-        values = {
-            16: 101,
-        }
-        # -----------------------------------------------------------------
-        computed = self.emc2101.update_lookup_table(values=values, unit=sut.FanSpeedUnit.PERCENT)
-        expected = True
-        # -----------------------------------------------------------------
-        self.assertEqual(computed, expected)  # update was performed
-        with BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=self.i2c_adr) as bh:
-            self.assertEqual(bh.read_register(0x50), 16)
-            self.assertEqual(bh.read_register(0x51), 0x0E)
+    def test_update_lookup_table_percent_out_of_range(self):
+        # (percentage, expected step)
+        cases = [
+            (-1,  0x0E),  # too low
+            (101, 0x0E),  # too high
+        ]
+        for value, step in cases:
+            with self.subTest(value=value):
+                values = {
+                    16: value,
+                }
+                # ---------------------------------------------------------
+                computed = self.emc2101.update_lookup_table(values=values, unit=sut.FanSpeedUnit.PERCENT)
+                expected = True
+                # ---------------------------------------------------------
+                self.assertEqual(computed, expected)  # update was performed
+                with BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=self.i2c_adr) as bh:
+                    self.assertEqual(read_registers(bh, 0x50, 16), bytes([16, step]) + bytes(14))
 
     def test_update_lookup_table_rpm(self):
         values = {
@@ -360,22 +383,16 @@ class TestEmc2101PWM(unittest.TestCase):
         # -----------------------------------------------------------------
         self.assertEqual(computed, expected)  # update was performed
         with BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=self.i2c_adr) as bh:
-            self.assertEqual(bh.read_register(0x50), 16)
-            self.assertEqual(bh.read_register(0x51), 0x08)
-            self.assertEqual(bh.read_register(0x52), 40)
-            self.assertEqual(bh.read_register(0x53), 0x09)
-            self.assertEqual(bh.read_register(0x54), 72)
-            self.assertEqual(bh.read_register(0x55), 0x0A)
+            self.assertEqual(read_registers(bh, 0x50, 16), bytes([16, 0x08, 40, 0x09, 72, 0x0A]) + bytes(10))
 
     def test_update_lookup_table_rpm_none(self):
-        device_config = sut.DeviceConfig(rpm_control_mode=sut.RpmControlMode.PWM, pin_six_mode=sut.PinSixMode.ALERT)
         steps = {
             0x03: (0, None),
             0x08: (0, None),
             0x0D: (0, None),
         }
-        fan_config = sut.FanConfig(model="Mockinator 2000", pwm_frequency=22500, rpm_control_mode=sut.RpmControlMode.PWM, minimum_duty_cycle=20, maximum_duty_cycle=100, minimum_rpm=100, maximum_rpm=2000, steps=steps)
-        emc2101 = sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=device_config, fan_config=fan_config)
+        fan_config = _make_fan_config(steps=steps)
+        emc2101 = sut.Emc2101_PWM(i2c_bus=self.i2c_bus, device_config=_DEVCFG_PWM_ALERT, fan_config=fan_config)
         emc2101.reset_lookup_table()
         values = {
             16: 0x03,  # no RPM availble - will be skipped
@@ -387,10 +404,7 @@ class TestEmc2101PWM(unittest.TestCase):
         # -----------------------------------------------------------------
         self.assertEqual(computed, expected)  # update was performed
         with BurstHandler(i2c_bus=self.i2c_bus, i2c_adr=self.i2c_adr) as bh:
-            self.assertEqual(bh.read_register(0x50), 00)
-            self.assertEqual(bh.read_register(0x51), 0x00)
-            self.assertEqual(bh.read_register(0x52), 00)
-            self.assertEqual(bh.read_register(0x53), 0x00)
+            self.assertEqual(read_registers(bh, 0x50, 16), bytes(16))
 
     def test_update_lookup_table_invalid_unit(self):
         values = {
@@ -398,4 +412,33 @@ class TestEmc2101PWM(unittest.TestCase):
         }
         # -----------------------------------------------------------------
         # -----------------------------------------------------------------
-        self.assertRaises(ValueError, self.emc2101.update_lookup_table, values=values, unit=None)
+        with self.assertRaises(ValueError):
+            self.emc2101.update_lookup_table(values=values, unit=None)
+
+
+# pylint: disable=protected-access
+class TestStepLookup(unittest.TestCase):
+
+    def test_find_closest_step(self):
+        # (label, (step, value) pairs in fan config order, value, expected step)
+        cases = [
+            ('exact match',      [(3, 34), (4, 40), (5, 44)],  40,   4),
+            ('between steps',    [(3, 34), (4, 40), (5, 44)],  43,   5),
+            ('below all steps',  [(3, 34), (4, 40), (5, 44)],  10,   3),
+            ('above all steps',  [(3, 34), (4, 40), (5, 44)],  101,  5),
+            ('negative value',   [(3, 34), (4, 40), (5, 44)],  -1,   5),
+            ('zero value',       [(4, 40), (3, 34), (5, 44)],  0,    4),
+            ('tie, first wins',  [(2, 20), (6, 30)],           24,   2),
+            ('tie, order kept',  [(6, 30), (2, 20)],           24,   6),
+            ('duplicate value',  [(3, 34), (4, 34)],           34,   3),
+            ('zero step value',  [(1, 0), (2, 1), (3, 50)],    1,    1),
+            ('value missing',    [(1, None), (2, 40)],         10,   2),
+            ('no values',        [(1, None)],                  10,   None),
+        ]
+        for label, pairs, value, expected in cases:
+            with self.subTest(label=label):
+                lookup = sut._build_step_lookup(pairs)
+                # ---------------------------------------------------------
+                computed = sut._find_closest_step(lookup, value)
+                # ---------------------------------------------------------
+                self.assertEqual(computed, expected)
@@ -2,86 +2,117 @@
 # pylint: disable=missing-class-docstring,missing-function-docstring,missing-module-docstring
 
 import unittest
+from types import MappingProxyType
 
 import feeph.emc2101.fan_configs as sut  # sytem under test
 
+# a valid PWM fan configuration; tests override individual fields
+# (read-only, shared by all tests)
+_BASE_PWM = MappingProxyType({
+    # fmt: off
+    'model':              'brown matter acceleration device',
+    'rpm_control_mode':   sut.RpmControlMode.PWM,
+    'minimum_duty_cycle': 20,
+    'maximum_duty_cycle': 100,
+    'minimum_rpm':        700,
+    'maximum_rpm':        1400,
+    'pwm_frequency':      22500,
+    'steps':              None,  # each FanConfig gets its own empty dict
+    # fmt: on
+})
+
+# what the importer is expected to produce for the DAC and PWM test data
+# (attribute name -> value)
+_EXPECTED_DAC_ATTRIBUTES = MappingProxyType({
+    # fmt: off
+    'model':              'Mockinator 2000 (DC)',
+    'rpm_control_mode':   sut.RpmControlMode.VOLTAGE,
+    'minimum_duty_cycle': None,
+    'maximum_duty_cycle': None,
+    'minimum_rpm':        700,
+    'maximum_rpm':        1400,
+    'pwm_frequency':      0,
+    'steps':              {2: (20, None), 4: (40, None)},
+    # fmt: on
+})
+_EXPECTED_PWM_ATTRIBUTES = MappingProxyType({
+    # fmt: off
+    'model':              'Mockinator 2000 (PWM)',
+    'rpm_control_mode':   sut.RpmControlMode.PWM,
+    'minimum_duty_cycle': 20,
+    'maximum_duty_cycle': 100,
+    'minimum_rpm':        700,
+    'maximum_rpm':        1400,
+    'pwm_frequency':      22500,
+    'steps':              {2: (20, 800), 4: (40, 1300)},
+    # fmt: on
+})
+
+# what the exporter is expected to produce for the DAC and PWM fan configs
+_EXPECTED_DAC_EXPORT = MappingProxyType({
+    'model': 'Mockinator 2000 (DC)',
+    'control_mode': 'VOLTAGE',
+    'minimum_rpm': 700,
+    'maximum_rpm': 1400,
+    'steps': {
+        2: {'dutycycle': 20, 'rpm': None},
+        4: {'dutycycle': 40, 'rpm': None},
+    },
+})
+_EXPECTED_PWM_EXPORT = MappingProxyType({
+    'model': 'Mockinator 2000 (PWM)',
+    'control_mode': 'PWM',
+    'minimum_duty_cycle': 20,
+    'maximum_duty_cycle': 100,
+    'minimum_rpm': 700,
+    'maximum_rpm': 1400,
+    'pwm_frequency': 22500,
+    'steps': {
+        2: {'dutycycle': 20, 'rpm': 800},
+        4: {'dutycycle': 40, 'rpm': 1300},
+    },
+})
+
 
 class TestFanConfigs(unittest.TestCase):
 
     def test_pwmfan_without_frequency(self):
-        params = {
-            # fmt: off
-            'model':              'brown matter acceleration device',
-            'rpm_control_mode':   sut.RpmControlMode.PWM,
-            'minimum_duty_cycle': 20,
-            'maximum_duty_cycle': 100,
-            'minimum_rpm':        700,
-            'maximum_rpm':        1400,
-            'pwm_frequency':      None,
-            'steps':              {},
-            # fmt: on
-        }
+        params = {**_BASE_PWM, 'pwm_frequency': None}
         # -----------------------------------------------------------------
         # -----------------------------------------------------------------
-        self.assertRaises(ValueError, sut.FanConfig, **params)
+        with self.assertRaises(ValueError):
+            sut.FanConfig(**params)
 
     def test_dutycycle_min_larger_than_max(self):
-        params = {
-            # fmt: off
-            'model':              'brown matter entropy averaging device',
-            'rpm_control_mode':   sut.RpmControlMode.PWM,
-            'minimum_duty_cycle': 120,
-            'maximum_duty_cycle': 100,
-            'minimum_rpm':        700,
-            'maximum_rpm':        1400,
-            'pwm_frequency':      22500,
-            'steps':              {},
-            # fmt: on
-        }
+        params = {**_BASE_PWM, 'minimum_duty_cycle': 120}
         # -----------------------------------------------------------------
         # -----------------------------------------------------------------
-        self.assertRaises(ValueError, sut.FanConfig, **params)
+        with self.assertRaises(ValueError):
+            sut.FanConfig(**params)
 
     def test_dutycycle_min_too_small(self):
-        params = {
-            # fmt: off
-            'model':              'brown matter impacting device',
-            'rpm_control_mode':   sut.RpmControlMode.PWM,
-            'minimum_duty_cycle': -1,
-            'maximum_duty_cycle': 100,
-            'minimum_rpm':        700,
-            'maximum_rpm':        1400,
-            'pwm_frequency':      22500,
-            'steps':              {},
-            # fmt: on
-        }
+        params = {**_BASE_PWM, 'minimum_duty_cycle': -1}
         # -----------------------------------------------------------------
         # -----------------------------------------------------------------
-        self.assertRaises(ValueError, sut.FanConfig, **params)
+        with self.assertRaises(ValueError):
+            sut.FanConfig(**params)
 
     def test_dutycycle_min_too_large(self):
-        params = {
-            # fmt: off
-            'model':              'brown matter granularity changing device',
-            'rpm_control_mode':   sut.RpmControlMode.PWM,  # RpmControlMode,
-            'minimum_duty_cycle': 20,  # int | None,
-            'maximum_duty_cycle': 101,  # int | None,
-            'minimum_rpm':        700,  # int,
-            'maximum_rpm':        1400,  # int,
-            'pwm_frequency':      22500,  # int | None = None,
-            'steps':              {},  # Steps | None = None,
-            # fmt: on
-        }
+        params = {**_BASE_PWM, 'maximum_duty_cycle': 101}
         # -----------------------------------------------------------------
         # -----------------------------------------------------------------
-        self.assertRaises(ValueError, sut.FanConfig, **params)
+        with self.assertRaises(ValueError):
+            sut.FanConfig(**params)
 
 
 # pylint: disable=missing-class-docstring,missing-function-docstring
 class TestFanConfigExporter(unittest.TestCase):
 
-    def test_export_dacfan(self):
-        params = {
+    @classmethod
+    def setUpClass(cls):
+        # exporting does not modify the fan configuration
+        # -> construct them once and share them between all tests
+        params_dac = {
             # fmt: off
             'model':              'Mockinator 2000 (DC)',
             'rpm_control_mode':   sut.RpmControlMode.VOLTAGE,
@@ -96,77 +127,37 @@ class TestFanConfigExporter(unittest.TestCase):
             },
             # fmt: on
         }
-        fc = sut.FanConfig(**params)
-        # -----------------------------------------------------------------
-        computed = sut.export_fan_config(fan_config=fc)
-        expected = {
-            'model': 'Mockinator 2000 (DC)',
-            'control_mode': 'VOLTAGE',
-            'minimum_rpm': 700,
-            'maximum_rpm': 1400,
+        params_pwm = {
+            **_BASE_PWM,
+            'model': 'Mockinator 2000 (PWM)',
             'steps': {
-                2: {'dutycycle': 20, 'rpm': None},
-                4: {'dutycycle': 40, 'rpm': None},
+                2: (20, 800),
+                4: (40, 1300),
             },
         }
+        cls.fc_dac = sut.FanConfig(**params_dac)
+        cls.fc_pwm = sut.FanConfig(**params_pwm)
+        cls.fc_invalid = sut.FanConfig(**{**params_dac, 'rpm_control_mode': None})
+
+    def test_export_dacfan(self):
+        # -----------------------------------------------------------------
+        computed = sut.export_fan_config(fan_config=self.fc_dac)
+        expected = _EXPECTED_DAC_EXPORT
         # -----------------------------------------------------------------
         self.assertEqual(computed, expected)
 
     def test_export_pwmfan(self):
-        params = {
-            # fmt: off
-            'model':              'Mockinator 2000 (PWM)',
-            'rpm_control_mode':   sut.RpmControlMode.PWM,
-            'minimum_duty_cycle': 20,
-            'maximum_duty_cycle': 100,
-            'minimum_rpm':        700,
-            'maximum_rpm':        1400,
-            'pwm_frequency':      22500,
-            'steps':              {
-                2: (20, 800),
-                4: (40, 1300),
-            },
-            # fmt: on
-        }
-        fc = sut.FanConfig(**params)
         # -----------------------------------------------------------------
-        computed = sut.export_fan_config(fan_config=fc)
-        expected = {
-            'model': 'Mockinator 2000 (PWM)',
-            'control_mode': 'PWM',
-            'minimum_duty_cycle': 20,
-            'maximum_duty_cycle': 100,
-            'minimum_rpm': 700,
-            'maximum_rpm': 1400,
-            'pwm_frequency': 22500,
-            'steps': {
-                2: {'dutycycle': 20, 'rpm': 800},
-                4: {'dutycycle': 40, 'rpm': 1300},
-            },
-        }
+        computed = sut.export_fan_config(fan_config=self.fc_pwm)
+        expected = _EXPECTED_PWM_EXPORT
         # -----------------------------------------------------------------
         self.assertEqual(computed, expected)
 
     def test_export_control_type_invalid(self):
-        params = {
-            # fmt: off
-            'model':              'Mockinator 2000 (DC)',
-            'rpm_control_mode':   None,
-            'minimum_duty_cycle': 20,
-            'maximum_duty_cycle': 100,
-            'minimum_rpm':        700,
-            'maximum_rpm':        1400,
-            'pwm_frequency':      None,
-            'steps':              {
-                2: (20, None),
-                4: (40, None),
-            },
-            # fmt: on
-        }
-        fc = sut.FanConfig(**params)
         # -----------------------------------------------------------------
         # -----------------------------------------------------------------
-        self.assertRaises(ValueError, sut.export_fan_config, fan_config=fc)
+        with self.assertRaises(ValueError):
+            sut.export_fan_config(fan_config=self.fc_invalid)
 
 
 # pylint: disable=missing-class-docstring,missing-function-docstring
@@ -185,17 +176,12 @@ class TestFanConfigImporter(unittest.TestCase):
             },
             # fmt: on
         }
-        fc = sut.import_fan_config(fan_config=data)
         # -----------------------------------------------------------------
+        fc = sut.import_fan_config(fan_config=data)
+        computed = {name: getattr(fc, name) for name in _EXPECTED_DAC_ATTRIBUTES}
+        expected = _EXPECTED_DAC_ATTRIBUTES
         # -----------------------------------------------------------------
-        self.assertEqual(fc.model, 'Mockinator 2000 (DC)')
-        self.assertEqual(fc.rpm_control_mode, sut.RpmControlMode.VOLTAGE)
-        self.assertEqual(fc.minimum_duty_cycle, None)
-        self.assertEqual(fc.maximum_duty_cycle, None)
-        self.assertEqual(fc.minimum_rpm, 700)
-        self.assertEqual(fc.maximum_rpm, 1400)
-        self.assertEqual(fc.pwm_frequency, 0)
-        self.assertEqual(fc.steps, {2: (20, None), 4: (40, None)})
+        self.assertEqual(computed, expected)
 
     def test_import_pwmfan(self):
         data = {
@@ -213,17 +199,12 @@ class TestFanConfigImporter(unittest.TestCase):
             },
             # fmt: on
         }
-        fc = sut.import_fan_config(fan_config=data)
         # -----------------------------------------------------------------
+        fc = sut.import_fan_config(fan_config=data)
+        computed = {name: getattr(fc, name) for name in _EXPECTED_PWM_ATTRIBUTES}
+        expected = _EXPECTED_PWM_ATTRIBUTES
         # -----------------------------------------------------------------
-        self.assertEqual(fc.model, 'Mockinator 2000 (PWM)')
-        self.assertEqual(fc.rpm_control_mode, sut.RpmControlMode.PWM)
-        self.assertEqual(fc.minimum_duty_cycle, 20)
-        self.assertEqual(fc.maximum_duty_cycle, 100)
-        self.assertEqual(fc.minimum_rpm, 700)
-        self.assertEqual(fc.maximum_rpm, 1400)
-        self.assertEqual(fc.pwm_frequency, 22500)
-        self.assertEqual(fc.steps, {2: (20, 800), 4: (40, 1300)})
+        self.assertEqual(computed, expected)
 
     def test_import_control_type_invalid(self):
         data = {
@@ -240,7 +221,8 @@ class TestFanConfigImporter(unittest.TestCase):
         }
         # -----------------------------------------------------------------
         # -----------------------------------------------------------------
-        self.assertRaises(ValueError, sut.import_fan_config, fan_config=data)
+        with self.assertRaises(ValueError):
+            sut.import_fan_config(fan_config=data)
 
     def test_import_step_invalid_data(self):
         data = {
@@ -259,7 +241,8 @@ class TestFanConfigImporter(unittest.TestCase):
         }
         # -----------------------------------------------------------------
         # -----------------------------------------------------------------
-        self.assertRaises(ValueError, sut.import_fan_config, fan_config=data)
+        with self.assertRaises(ValueError):
+            sut.import_fan_config(fan_config=data)
 
     def test_import_step_invalid_type(self):
         data = {
@@ -276,4 +259,5 @@ class TestFanConfigImporter(unittest.TestCase):
         }
         # -----------------------------------------------------------------
         # -----------------------------------------------------------------
-        self.assertRaises(ValueError, sut.import_fan_config, fan_config=data)
+        with self.assertRaises(ValueError):
+            sut.import_fan_config(fan_config=data)
@@ -18,11 +18,20 @@ class TestFanConfigs(unittest.TestCase):
              1000: (6, 30),  # noqa: E131
         }
         for pwm_frequency, pwm_settings in values.items():
-            computed = sut.calculate_pwm_factors(pwm_frequency=pwm_frequency)
-            expected = pwm_settings
-            self.assertEqual(computed, expected)
+            with self.subTest(pwm_frequency=pwm_frequency):
+                computed = sut.calculate_pwm_factors(pwm_frequency=pwm_frequency)
+                expected = pwm_settings
+                self.assertEqual(computed, expected)
 
     def test_pwm_factors_invalid(self):
         # -----------------------------------------------------------------
         # -----------------------------------------------------------------
         self.assertRaises(ValueError, sut.calculate_pwm_factors, pwm_frequency=-1)
+
+    def test_pwm_factors_float(self):
+        # -----------------------------------------------------------------
+        computed = sut.calculate_pwm_factors(pwm_frequency=22500.0)
+        expected = (1, 8)
+        # -----------------------------------------------------------------
+        self.assertEqual(computed, expected)
+        self.assertTrue(all(isinstance(factor, int) for factor in computed))
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# pylint: disable=missing-function-docstring,missing-module-docstring,redefined-outer-name
+
+import os
+
+import pytest
+from feeph.i2c import EmulatedI2C
+
+import feeph.emc2101.core as sut  # sytem under test
+from helpers import REGISTER_TEMPLATE, create_hardware_i2c_bus
+
+if os.environ.get('TEST_EMC2101_CHIP', 'n') == 'y':
+    HAS_HARDWARE = True
+else:
+    HAS_HARDWARE = False
+
+
+# input validation happens before any register is touched
+# -> a single device instance can be shared by all tests in this module
+@pytest.fixture(scope="module")
+def emc2101() -> sut.Emc2101:
+    i2c_adr = 0x4C
+    if HAS_HARDWARE:
+        i2c_bus = create_hardware_i2c_bus()
+    else:
+        i2c_bus = EmulatedI2C(state={i2c_adr: dict(REGISTER_TEMPLATE)})
+    emc2101 = sut.Emc2101(i2c_bus=i2c_bus, config=sut.ConfigRegister())
+    # restore original state
+    # (hardware is not stateless)
+    emc2101.reset_device_registers()
+    return emc2101
+
+
+@pytest.mark.parametrize("method, value", [
+    # fmt: off
+    ("set_ets_low_temperature_limit",  -10),  # below minimum temperature
+    ("set_ets_high_temperature_limit", 120),  # above maximum temperature
+    ("configure_minimum_rpm",           80),  # measured RPM can never be lower than 82 RPM
+    # fmt: on
+])
+def test_invalid_value(emc2101: sut.Emc2101, method: str, value: int):
+    # -----------------------------------------------------------------
+    # -----------------------------------------------------------------
+    with pytest.raises(ValueError):
+        getattr(emc2101, method)(value)